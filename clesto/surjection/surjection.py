@@ -6,10 +6,131 @@ from ..eilenberg_zilber import Simplex, EilenbergZilber_element
 from ..eilenberg_zilber import CubicalEilenbergZilber_element
 from ..utils import pairwise
 
+from collections import Counter, defaultdict
 from itertools import chain, combinations, product, combinations_with_replacement
-from operator import itemgetter
-from functools import reduce
+from operator import itemgetter, mul
+from functools import reduce, lru_cache
 from math import floor, factorial
+import numpy as np
+
+
+# sign (-1)^n indexed by the parity n & 1
+_SGN = (1, -1)
+
+# bases of Surj(arity) keyed by (arity, degree, complexity)
+_basis_cache = {}
+
+
+@lru_cache(maxsize=None)
+def _full_set(m):
+    """The set {1,...,m}."""
+    return frozenset(range(1, m + 1))
+
+
+@lru_cache(maxsize=None)
+def _complexity(k):
+    """Complexity of a basis surjection.
+
+    For each pair i < j the entries of k equal to i or j are walked once,
+    counting the changes of value between consecutive ones.
+
+    """
+    m = max(k)
+    answer = 0
+    for i in range(1, m + 1):
+        for j in range(i + 1, m + 1):
+            last, runs = 0, 0
+            for e in k:
+                if (e == i or e == j) and e != last:
+                    runs += 1
+                    last = e
+            # the number of changes of value is runs - 1
+            if runs - 2 > answer:
+                answer = runs - 2
+    return answer
+
+
+@lru_cache(maxsize=None)
+def _boundary(k, convention):
+    """Summands of the boundary of a basis surjection.
+
+    Returns a tuple of pairs (summand, sign) following the given
+    convention, either 'Berger-Fresse' or 'McClure-Smith'.
+
+    """
+    answer = []
+    if convention == 'Berger-Fresse':
+        # determining the signs of the summands in one pass, using the
+        # number of occurences to the right and the last one to the left
+        counts = Counter(k)
+        right_counts = counts.copy()
+        last_seen = {}
+        signs = [0] * len(k)
+        alternating_sign = 1
+        for idx, i in enumerate(k):
+            right_counts[i] -= 1
+            if right_counts[i]:
+                signs[idx] = alternating_sign
+                alternating_sign *= (-1)
+            elif i in last_seen:
+                signs[idx] = signs[last_seen[i]] * (-1)
+            last_seen[i] = idx
+
+        # computing the summands
+        for idx, i in enumerate(k):
+            if counts[i] > 1:
+                answer.append((k[:idx] + k[idx + 1:], signs[idx]))
+
+    if convention == 'McClure-Smith':
+        positions = defaultdict(list)
+        for idx, j in enumerate(k):
+            positions[j].append(idx)
+        sign = 1
+        for i in range(1, max(k) + 1):
+            repeated = len(positions[i]) > 1
+            for idx in positions[i]:
+                if repeated:
+                    answer.append((k[:idx] + k[idx + 1:], sign))
+                sign *= -1
+            sign *= -1
+
+    return tuple(answer)
+
+
+@lru_cache(maxsize=None)
+def _suspension(k, arity):
+    """Image of a basis surjection in the suspension.
+
+    Returns the pair (key, sign) or None if (k(1),...,k(arity)) is not a
+    permutation.
+
+    """
+    try:
+        sign = SymmetricGroup_element(k[:arity]).sign
+    except TypeError:
+        return None
+    return k[arity - 1:], sign
+
+
+@lru_cache(maxsize=256)
+def _iterated_diagonal(element_type, items, torsion, *args):
+    """Iterated diagonal of the element with the given frozen items.
+
+    The returned element is shared between calls and must not be modified.
+
+    """
+    element = element_type(dict(items), torsion=torsion)
+    return element.iterated_diagonal(*args)
+
+
+@lru_cache(maxsize=None)
+def _join(element_type, key, torsion):
+    """Join of the cubical Eilenberg-Zilber basis element key.
+
+    The returned element is shared between calls and must not be modified.
+
+    """
+    return element_type({key: 1}, torsion=torsion).join()
 
 
 class Surjection_element(Module_element):
@@ -108,14 +229,7 @@ class Surjection_element(Module_element):
         1
 
         """
-        complexities = [0]
-        for key in self.keys():
-            for i, j in combinations(range(1, max(key) + 1), 2):
-                r = tuple(k for k in key if k == i or k == j)
-                cpxty = len([p for p, q in pairwise(r) if p != q]) - 1
-                complexities.append(cpxty)
-
-        return max(complexities)
+        return max((_complexity(key) for key in self.keys()), default=0)
 
     def boundary(self):
         """boundary of self
@@ -131,48 +245,22 @@ class Surjection_element(Module_element):
         (2,1,3,1,3) - (1,2,3,1,3) - (1,2,1,3,1)
 
         """
-        answer = self.zero()
+        answer = defaultdict(int)
 
         if self.torsion == 2:
             for k in self.keys():
-                for idx in range(0, len(k)):
-                    bdry_summand = k[:idx] + k[idx + 1:]
-                    if k[idx] in bdry_summand:
-                        answer += self.create({bdry_summand: 1})
+                for bdry_summand, _ in _boundary(k, self.convention):
+                    answer[bdry_summand] += 1
+            answer = self.create(answer)
+            answer._reduce_rep()
             return answer
 
-        if self.convention == 'Berger-Fresse':
-            for k, v in self.items():
-                # determining the signs of the summands
-                signs = {}
-                alternating_sign = 1
-                for idx, i in enumerate(k):
-                    if i in k[idx + 1:]:
-                        signs[idx] = alternating_sign
-                        alternating_sign *= (-1)
-                    elif i in k[:idx]:
-                        occurs = (pos for pos, j in enumerate(k[:idx]) if i == j)
-                        signs[idx] = signs[max(occurs)] * (-1)
-                    else:
-                        signs[idx] = 0
-
-                # computing the summands
-                for idx in range(0, len(k)):
-                    bdry_summand = k[:idx] + k[idx + 1:]
-                    if k[idx] in bdry_summand:
-                        answer += self.create({bdry_summand: signs[idx] * v})
-
-        if self.convention == 'McClure-Smith':
-            for k, v in self.items():
-                sign = 1
-                for i in range(1, max(k) + 1):
-                    for idx in (idx for idx, j in enumerate(k) if j == i):
-                        new_k = k[:idx] + k[idx + 1:]
-                        if k[idx] in new_k:
-                            answer += answer.create({new_k: v * sign})
-                        sign *= -1
-                    sign *= -1
+        for k, v in self.items():
+            for bdry_summand, sign in _boundary(k, self.convention):
+                answer[bdry_summand] += sign * v
 
+        answer = self.create(answer)
+        answer._reduce_rep()
         return answer
 
     def __rmul__(self, other):
@@ -198,29 +286,46 @@ class Surjection_element(Module_element):
             if self.arity != other.arity:
                 raise TypeError('Unequal arity attribute')
 
-        def sign(perm, surj, convention):
-            if convention == 'Berger-Fresse':
-                return 1
-            assert convention == 'McClure-Smith'
-            weights = [surj.count(i) - 1 for
-                       i in range(1, max(surj) + 1)]
+        def ms_sign(perm, weights):
+            """Sign of the McClure-Smith action given the weights of
+            the surjection, i.e., the number of repetitions of each value.
+
+            """
             sign_exp = 0
             for idx, i in enumerate(perm):
-                right = [weights[perm.index(j)] for
-                         j in perm[idx + 1:] if i > j]
+                right = [weights[pos] for pos in range(idx + 1, len(perm))
+                         if i > perm[pos]]
                 sign_exp += sum(right) * weights[idx]
-            return (-1)**(sign_exp % 2)
+            return _SGN[sign_exp & 1]
 
         if isinstance(other, int):
             return super().__rmul__(other)
 
         check_input(self, other)
 
-        answer = self.zero()
-        for (k1, v1), (k2, v2) in product(self.items(), other.items()):
-            new_key = tuple(k2[i - 1] for i in k1)
-            new_sign = sign(k2, k1, self.convention)
-            answer += self.create({new_key: new_sign * v1 * v2})
+        def gatherer(k1):
+            """Function sending k2 to the tuple (k2[k1[0]-1], k2[k1[1]-1], ...)."""
+            gather = itemgetter(*(i - 1 for i in k1))
+            if len(k1) == 1:
+                return lambda k2: (gather(k2),)
+            return gather
+
+        answer = defaultdict(int)
+        if self.convention == 'Berger-Fresse':
+            for k1, v1 in self.items():
+                gather = gatherer(k1)
+                for k2, v2 in other.items():
+                    answer[gather(k2)] += v1 * v2
+        else:
+            assert self.convention == 'McClure-Smith'
+            for k1, v1 in self.items():
+                gather = gatherer(k1)
+                counts = Counter(k1)
+                weights = [counts[i] - 1 for i in range(1, max(k1) + 1)]
+                for k2, v2 in other.items():
+                    answer[gather(k2)] += ms_sign(k2, weights) * v1 * v2
+        answer = self.create(answer)
+        answer._reduce_rep()
         return answer
 
     def orbit(self, representation='trivial'):
@@ -245,16 +350,16 @@ class Surjection_element(Module_element):
             if representation == 'sign':
                 return permutation.sign
 
-        answer = self.zero()
+        answer = defaultdict(int)
         for k, v in self.items():
-            seen = []
-            for i in k:
-                if i not in seen:
-                    seen.append(i)
+            seen = list(dict.fromkeys(k))
             permutation = SymmetricGroup_element(seen).inverse()
             new_v = sign(permutation, representation) * v
-            answer += permutation * self.create({k: new_v})
+            for new_k, w in (permutation * self.create({k: new_v})).items():
+                answer[new_k] += w
 
+        answer = self.create(answer)
+        answer._reduce_rep()
         return answer
 
     def __call__(self, other, coord=1):
@@ -292,12 +397,15 @@ class Surjection_element(Module_element):
                 list of weights
 
                 """
+                # weights are 0 or 1, so they are packed as bits of an int
+                weights_bits = sum(w << pos for pos, w in enumerate(weights))
                 sign_exp = 0
                 for idx, j in enumerate(permu):
-                    to_add = [weights[permu.index(i)] for
-                              i in permu[idx + 1:] if i < j]
-                    sign_exp += weights[idx] * sum(to_add)
-                return sign_exp % 2
+                    if weights[idx]:
+                        mask = sum(1 << pos for pos in range(idx + 1, len(permu))
+                                   if permu[pos] < j)
+                        sign_exp ^= bin(weights_bits & mask).count('1') & 1
+                return sign_exp
 
             def action_sign(ordered_k1, ordered_weights):
                 """Given a ordered tuple [1,..,1, 2,...,2, ..., r,...,r]
@@ -306,83 +414,100 @@ class Surjection_element(Module_element):
                 operator between equal consecutive elements.
 
                 """
-                sign_exp = 0
+                sign_exp, partial_sum = 0, 0
                 for idx, (i, j) in enumerate(pairwise(ordered_k1)):
+                    partial_sum ^= ordered_weights[idx]
                     if i == j:
-                        sign_exp += sum(ordered_weights[:idx + 1])
-                return sign_exp % 2
+                        sign_exp ^= partial_sum
+                return sign_exp
 
             sign_exp = 0
             weights = [e.dimension % 2 for e in k2]
             inv_ordering_permu = [pair[0] for pair in
                                   sorted(enumerate(k1), key=itemgetter(1))]
-            ordering_permu = tuple(inv_ordering_permu.index(i)
-                                   for i in range(len(inv_ordering_permu)))
+            ordering_permu = [0] * len(inv_ordering_permu)
+            for idx, i in enumerate(inv_ordering_permu):
+                ordering_permu[i] = idx
             sign_exp += ordering_sign(ordering_permu, weights)
             ordered_k1 = list(sorted(k1))
             ordered_weights = [weights[i] for i in inv_ordering_permu]
             sign_exp += action_sign(ordered_k1, ordered_weights)
-            return (-1)**sign_exp
+            return _SGN[sign_exp & 1]
 
         def simplicial(self, other, coord):
             """Action on Eilenberg-Zilber elements."""
-            answer = other.zero()
+            answer = defaultdict(int)
             times = self.arity + self.degree - 1
-            pre_join = other.iterated_diagonal(times, coord)
-            for (k1, v1), (k2, v2) in product(self.items(), pre_join.items()):
-                i, j = coord - 1, coord + len(k1) - 1
-                left, k2, right = k2[:i], k2[i:j], k2[j:]
-                new_k = []
-                zero_summand = False
-                for i in range(1, max(k1) + 1):
-                    to_join = (spx for idx, spx in enumerate(k2)
-                               if k1[idx] == i)
-                    joined = Simplex(reduce(lambda x, y: x + y, to_join))
-                    if joined.is_degenerate():
-                        zero_summand = True
-                        break
-                    new_k.append(joined)
-
-                if not zero_summand:
-                    if self.torsion == 2:
-                        sign = 1
-                    else:
-                        sign = compute_sign(k1, k2)
-                        deg_left = sum(len(spx) - 1 for spx in left) % 2
-                        sign *= (-1)**(deg_left * self.degree)
-
-                    answer += answer.create({left + tuple(new_k) + right:
-                                             sign * v1 * v2})
+            pre_join = _iterated_diagonal(type(other), frozenset(other.items()),
+                                          other.torsion, times, coord)
+            for k1, v1 in self.items():
+                groups = [[idx for idx, j in enumerate(k1) if j == i]
+                          for i in range(1, max(k1) + 1)]
+                for k2, v2 in pre_join.items():
+                    i, j = coord - 1, coord + len(k1) - 1
+                    left, k2, right = k2[:i], k2[i:j], k2[j:]
+                    new_k = []
+                    zero_summand = False
+                    for group in groups:
+                        to_join = [k2[idx] for idx in group]
+                        # equal values where two simplices meet are degenerate
+                        if any(spx1[-1] == spx2[0]
+                               for spx1, spx2 in pairwise(to_join)):
+                            zero_summand = True
+                            break
+                        joined = Simplex(tuple(chain.from_iterable(to_join)))
+                        if joined.is_degenerate():
+                            zero_summand = True
+                            break
+                        new_k.append(joined)
+
+                    if not zero_summand:
+                        if self.torsion == 2:
+                            sign = 1
+                        else:
+                            sign = compute_sign(k1, k2)
+                            deg_left = sum(len(spx) - 1 for spx in left) % 2
+                            sign *= _SGN[deg_left * self.degree & 1]
+
+                        answer[left + tuple(new_k) + right] += sign * v1 * v2
+            answer = other.create(answer)
+            answer._reduce_rep()
             return answer
 
         def cubical(self, other):
             """Action on cubical Eilenberg-Zilber elements."""
-            answer = other.zero()
-            pre_join = other.iterated_diagonal(self.arity + self.degree - 1)
-            for (k1, v1), (k2, v2) in product(self.items(), pre_join.items()):
-                to_dist = []
-                zero_summand = False
-                for i in range(1, max(k1) + 1):
-                    key_to_join = tuple(cube for idx, cube in enumerate(k2)
-                                        if k1[idx] == i)
-                    joined = other.create({key_to_join: 1}).join()
-                    if not joined:
-                        zero_summand = True
-                        break
-                    to_dist.append(joined)
-
-                if not zero_summand:
-                    if self.torsion == 2:
-                        sign = 1
-                    else:
-                        sign = compute_sign(k1, k2)
-
-                    items_to_dist = [summand.items() for summand in to_dist]
-                    for pairs in product(*items_to_dist):
-                        new_k = reduce(lambda x, y: x + y, (pair[0] for pair in pairs))
-                        new_v = reduce(lambda x, y: x * y, (pair[1] for pair in pairs))
-                        to_add = answer.create({tuple(new_k): sign * new_v * v1 * v2})
-                        answer += to_add
+            answer = defaultdict(int)
+            times = self.arity + self.degree - 1
+            pre_join = _iterated_diagonal(type(other), frozenset(other.items()),
+                                          other.torsion, times)
+            for k1, v1 in self.items():
+                groups = [[idx for idx, j in enumerate(k1) if j == i]
+                          for i in range(1, max(k1) + 1)]
+                for k2, v2 in pre_join.items():
+                    to_dist = []
+                    zero_summand = False
+                    for group in groups:
+                        key_to_join = tuple(k2[idx] for idx in group)
+                        joined = _join(type(other), key_to_join, other.torsion)
+                        if not joined:
+                            zero_summand = True
+                            break
+                        to_dist.append(joined)
+
+                    if not zero_summand:
+                        if self.torsion == 2:
+                            sign = 1
+                        else:
+                            sign = compute_sign(k1, k2)
+
+                        items_to_dist = [summand.items() for summand in to_dist]
+                        for pairs in product(*items_to_dist):
+                            new_k = tuple(chain.from_iterable(
+                                pair[0] for pair in pairs))
+                            new_v = reduce(mul, (pair[1] for pair in pairs))
+                            answer[new_k] += sign * new_v * v1 * v2
+            answer = other.create(answer)
+            answer._reduce_rep()
             return answer
 
         if not self or not other:
@@ -413,67 +538,67 @@ class Surjection_element(Module_element):
         (1,3,1,2,1,4) - (1,2,3,2,1,4) - (1,2,1,3,1,4)
 
         """
-        def bf_sign(p1, k1, p2, k2):
-            """Sign associated to the Berger-Fresse composition."""
-
-            def caesuras(k):
-                """Returns the caesuras of a basis element."""
-                caesuras = []
-                for idx, i in enumerate(k):
-                    if i in k[idx + 1:]:
-                        caesuras.append(idx)
-                return caesuras
-
-            def weights(cae, p):
-                """Returns the weights of the splitting knowing the caesuras."""
-                weights = []
-                for i, j in pairwise(p):
-                    closed_open = len([e for e in cae if i <= e < j])
-                    weights.append(closed_open)
-                return [value % 2 for value in weights]
-
-            p1 = [0] + p1 + [len(k1) - 1]
-            cae1 = caesuras(k1)
-            w1 = weights(cae1, p1)
-            cae2 = caesuras(k2)
-            w2 = weights(cae2, p2)
+        def caesuras(k):
+            """Returns the caesuras of a basis element."""
+            caesuras = []
+            for idx, i in enumerate(k):
+                if i in k[idx + 1:]:
+                    caesuras.append(idx)
+            return caesuras
+
+        def weights(cae, p):
+            """Returns the weights of the splitting knowing the caesuras."""
+            weights = []
+            for i, j in pairwise(p):
+                closed_open = len([e for e in cae if i <= e < j])
+                weights.append(closed_open)
+            return [value % 2 for value in weights]
+
+        def bf_sign(w1, w2):
+            """Sign associated to the Berger-Fresse composition given the
+            weights of the splittings of both factors."""
             sign_exp = 0
             for idx, w in enumerate(w2):
                 if w:
                     sign_exp += sum(w1[idx + 1:]) % 2
-            return (-1) ** sign_exp
+            return _SGN[sign_exp & 1]
 
         def ms_sign(positions, k1, p, k2):
             raise NotImplementedError
 
-        answer = self.zero()
-        for (k1, v1), (k2, v2) in product(self.items(), other.items()):
+        if not self or not other:
+            return self.zero()
+
+        shift = other.arity - 1
+        answer = defaultdict(int)
+        for k1, v1 in self.items():
             positions = [idx for idx, j in enumerate(k1) if j == position]
-            for p in combinations_with_replacement(
-                    range(len(k2)), len(positions) - 1):
-                p = (0,) + p + (len(k2) - 1,)
-                split = []
-                for a, b in pairwise(p):
-                    split.append(tuple(k2[a:b + 1]))
-                to_insert = (tuple(j + position - 1 for j in part) for part in split)
-                new_k = list()
-                for j in k1:
-                    if j < position:
-                        new_k.append(j)
-                    elif j == position:
-                        new_k += next(to_insert)
-                    else:
-                        new_k.append(j + other.arity - 1)
-
-                if self.torsion == 2:
-                    sign = 1
-                elif self.convention == 'Berger-Fresse':
-                    sign = bf_sign(positions, k1, p, k2)
-                elif self.convention == 'McClure-Smith':
-                    sign = ms_sign()
-
-                answer += answer.create({tuple(new_k): v1 * v2 * sign})
+            w1 = weights(caesuras(k1), [0] + positions + [len(k1) - 1])
+            # the shifted parts of k1 around the occurrences of position
+            shifted1 = tuple(j if j < position else j + shift for j in k1)
+            bounds = [-1] + positions + [len(k1)]
+            static = [shifted1[a + 1:b] for a, b in pairwise(bounds)]
+            for k2, v2 in other.items():
+                shifted2 = tuple(j + position - 1 for j in k2)
+                cae2 = caesuras(k2)
+                for p in combinations_with_replacement(
+                        range(len(k2)), len(positions) - 1):
+                    p = (0,) + p + (len(k2) - 1,)
+                    new_k = static[0]
+                    for (a, b), part in zip(pairwise(p), static[1:]):
+                        new_k += shifted2[a:b + 1] + part
+
+                    if self.torsion == 2:
+                        sign = 1
+                    elif self.convention == 'Berger-Fresse':
+                        sign = bf_sign(w1, weights(cae2, p))
+                    elif self.convention == 'McClure-Smith':
+                        sign = ms_sign(positions, k1, p, k2)
+
+                    answer[new_k] += v1 * v2 * sign
 
+        answer = self.create(answer)
+        answer._reduce_rep()
         return answer
 
     def suspension(self):
@@ -498,35 +623,24 @@ class Surjection_element(Module_element):
             raise NotImplementedError
 
         answer = self.zero()
+        arity = self.arity
         for k, v in self.items():
-            nonzero = False
-            try:
-                p = SymmetricGroup_element(k[:self.arity])
-                sign = p.sign
-                nonzero = True
-            except TypeError:
-                pass
-            if nonzero:
-                answer += self.create({k[self.arity - 1:]: v * sign})
+            suspended = _suspension(k, arity)
+            if suspended is not None:
+                new_k, sign = suspended
+                answer += self.create({new_k: v * sign})
 
         return answer
 
     def _reduce_rep(self):
         """Sets to 0 all degenerate surjections."""
-        # removes non-surjections
-        zeros = list()
-        for k in self.keys():
-            if set(k) != set(range(1, max(k) + 1)):
-                zeros.append(k)
+        # removes non-surjections and keys w/ equal consecutive values
+        zeros = [k for k in self.keys()
+                 if frozenset(k) != _full_set(max(k))
+                 or any(i == j for i, j in pairwise(k))]
         for k in zeros:
             del self[k]
 
-        # removes keys w/ equal consecutive values
-        for k, v in self.items():
-            for i in range(len(k) - 1):
-                if k[i] == k[i + 1]:
-                    self[k] = 0
-
         super()._reduce_rep()
 
 
@@ -595,8 +709,12 @@ class Surjection():
 
             """
             answer = s(surj)
+            projected = surj
             for r in range(1, arity - 1):
-                answer += i(s(p(surj, r)), r)
+                projected = p(projected)
+                if not projected:
+                    break
+                answer += i(s(projected), r)
             return answer
 
         operators = {
@@ -643,7 +761,7 @@ class Surjection():
         else:
             b = int(bockstein)
             # Serre convention: v(2j)=(-1)^j & v(2j+1)=v(2j)*m! w/ m=(p-1)/2
-            coeff = (-1)**(floor(q / 2) + s)
+            coeff = _SGN[(floor(q / 2) + s) & 1]
             if q / 2 - floor(q / 2):
                 coeff *= factorial((p - 1) / 2)
             # degree of the element: (2s-q)(p-1)-b
@@ -664,10 +782,38 @@ class Surjection():
         if complexity is None:
             complexity = degree
         a, d, c = arity, degree, complexity
-        basis = []
-        for s in product(range(1, a + 1), repeat=a + d):
-            surj = Surjection_element({s: 1})
-            if surj and surj.complexity <= c and surj.arity == a:
-                basis.append(s)
+        if (a, d, c) in _basis_cache:
+            return list(_basis_cache[(a, d, c)])
+
+        # candidate sequences after the first entry, in lexicographic order
+        n = a + d - 1
+        tails = np.indices((a,) * n, dtype=np.uint8).reshape(n, a ** n).T + 1
+        positions = np.arange(a + d, dtype=np.int8)
 
-        return basis
+        # processing one first entry at a time bounds the memory used
+        basis = []
+        for first in range(1, a + 1):
+            arr = np.empty((len(tails), a + d), dtype=np.uint8)
+            arr[:, 0] = first
+            arr[:, 1:] = tails
+
+            # removes non-surjections and keys w/ equal consecutive values
+            keep = ~(arr[:, 1:] == arr[:, :-1]).any(axis=1)
+            for i in range(1, a + 1):
+                keep &= (arr == i).any(axis=1)
+            arr = arr[keep]
+
+            # complexity of each row as the max over its arity 2 components
+            cpxty = np.zeros(len(arr), dtype=np.int8)
+            for i, j in combinations(range(1, a + 1), 2):
+                mask = (arr == i) | (arr == j)
+                last = np.maximum.accumulate(
+                    np.where(mask, positions, -1), axis=1)[:, :-1]
+                prev = np.take_along_axis(arr, np.maximum(last, 0), axis=1)
+                changes = mask[:, 1:] & (last >= 0) & (prev != arr[:, 1:])
+                cpxty = np.maximum(cpxty, changes.sum(axis=1) - 1)
+            arr = arr[cpxty <= c]
+
+            basis += [tuple(row) for row in arr.tolist()]
+        _basis_cache[(a, d, c)] = basis
+        return list(basis)
@@ -120,6 +120,18 @@ class TestSurjection(unittest.TestCase):
                                             convention='McClure-Smith')
         self.assertEqual(x, y)
 
+    def test_basis(self):
+        self.assertEqual(Surjection.basis(2, 2), [(1, 2, 1, 2), (2, 1, 2, 1)])
+
+        b = Surjection.basis(2, 2)
+        b.pop()
+        self.assertEqual(Surjection.basis(2, 2), [(1, 2, 1, 2), (2, 1, 2, 1)])
+
+        for s in Surjection.basis(4, 2, complexity=1):
+            x = Surjection_element({s: 1})
+            self.assertEqual((x.arity, x.degree), (4, 2))
+            self.assertLessEqual(x.complexity, 1)
+
 
 if __name__ == '__main__':
     unittest.main()